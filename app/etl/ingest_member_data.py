@@ -4,11 +4,18 @@ It reads data from a file(s) having pipe separated data (data), transform data t
 load the data into MongoDB.
 """
 
+import calendar
 import csv
+import functools
+from collections import Counter
 import logging
+import math
 import datetime as dt
 import re
+import string
 from decimal import Decimal
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
 import pymongo
 import os
 
@@ -20,6 +27,9 @@ QUOTECHAR = '"'
 # Source file delimiter
 DELIMITER = '|'
 
+# Read buffer size of the source file
+READ_BUFFER_SIZE = 1 << 20
+
 # Source file schema
 SCHEMA = [("FirstName", "string"),
           ("LastName", "string"),
@@ -34,20 +44,89 @@ SCHEMA = [("FirstName", "string"),
           ("Mobile", "number"),
           ("Email", "string")]
 
+# Source file field count
+FIELD_COUNT = len(SCHEMA)
+
+# A source file record with the fields in schema order. A named tuple is much smaller than a dict per record.
+MemberRecord = NamedTuple("MemberRecord", [(fn, str) for (fn, ft) in SCHEMA])
+
+# Source fields which are not kept after transformation
+UNUSED_FIELDS = ("FirstName", "LastName", "Suburb", "State", "Post")
+
 # Reference date used to calculate age
-REFERENCE_DATE = dt.datetime.strptime("2024-03-01", "%Y-%m-%d")
+REFERENCE_DATE = dt.datetime(2024, 3, 1)
+
+# Days of every month in a non leap year
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Leading non alphabetic characters to be removed from a name
+LEADING_NON_ALPHA_PATTERN = re.compile(r'^[^A-Za-z]+')
+
+# Alphabetic characters a name must start with
+ASCII_LETTERS = frozenset(string.ascii_letters)
+
+# Translation table to remove the $ sign and commas from a formatted salary
+SALARY_STRIP_TABLE = str.maketrans('', '', '$,')
+
+# Salary bucket limits
+SALARY_BUCKET_A_LIMIT = 50000
+SALARY_BUCKET_C_LIMIT = 100000
+
+# Salary buckets, indexed by the number of bucket limits a salary is above.
+# Bucket B includes both limits, so a salary must be above 100,000 to be in bucket C.
+SALARY_BUCKETS = "ABC"
+
+# Decimal places kept in a formatted salary
+SALARY_DECIMAL_PLACES = 4
+
+# Set STRICT_DECIMAL=1 to parse salaries as Decimal instead of float, e.g. for auditing
+STRICT_DECIMAL = os.environ.get("STRICT_DECIMAL") == "1"
 
 MONGO_DATABASE = "revenue_db"
 MONGO_COLLECTION = "member_data"
 
+# Number of records transformed together in one batch
+TRANSFORM_BATCH_SIZE = 10000
+
+# Number of records sent to MongoDB in one insert_many call
+MONGO_BATCH_SIZE = 1000
+
+# MongoDB client shared by all the writes in this process. It is created on first use.
+mongo_client = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_record_type(field_names:tuple)->type:
+    """ Get the named tuple type of records with the given field names.
+
+        MemberRecord is returned for the source file schema. The type of any other schema is created once
+        and cached.
+
+        Parameters
+        -----------
+        field_names: tuple
+            The field names of the record.
+
+        Returns
+        -----------
+        :type
+            The named tuple type with the field names.
+    """
+    if field_names == MemberRecord._fields:
+        return MemberRecord
+    return NamedTuple("Record", [(fn, str) for fn in field_names])
 
-def convert_record_to_dict(record:list, schema:list=SCHEMA)->dict:
-    """ Convert a record from a list to a dict.
 
-        If the record list has the same count of items as the schema, a proper dictionary
-        is return. All the field values are stripped off the leading and trailing white spaces.
+def convert_record_to_dict(record:list, schema:list=SCHEMA)->MemberRecord:
+    """ Convert a record from a list to a MemberRecord.
+
+        If the record list has the same count of items as the schema, a MemberRecord is return.
+        All the field values are stripped off the leading and trailing white spaces.
         Otherwise, return None and ignore this record.
 
+        Developer Note: The record used to be converted to a dict, as the function name says. A named tuple
+        is much smaller than a dict per record and its fields can still be accessed by name.
+
         Parameters
         -----------
         record: list
@@ -57,15 +136,21 @@ def convert_record_to_dict(record:list, schema:list=SCHEMA)->dict:
 
         Returns
         -----------
-        :dict
-            A dictionary with field name as key and field value as value.
+        :MemberRecord
+            A MemberRecord with the field values in schema order. A named tuple with the schema field
+            names if the schema is not the source file schema.
 
     """
-    if len(record) != len(schema):
-        logger.warning(f"""Ignore record with different number of fields than the schema. Record:[{record}].""")
+    if schema is SCHEMA:
+        record_type, field_count = MemberRecord, FIELD_COUNT
+    else:
+        record_type, field_count = get_record_type(tuple(fn for (fn, ft) in schema)), len(schema)
+
+    if len(record) != field_count:
+        logger.warning("Ignore record with different number of fields than the schema. Record:[%s].", record)
         return None
 
-    return {fn:v.strip() for ((fn, ft), v) in zip(schema, record)}
+    return record_type._make(map(str.strip, record))
 
 
 def transform_name(raw_name:str)->str:
@@ -88,9 +173,70 @@ def transform_name(raw_name:str)->str:
     if not raw_name:
         return None
 
-    name = re.sub(r'(^[^A-Za-z]+)|(\s+$)', '', raw_name).capitalize()
+    name = raw_name.rstrip()
+
+    # Most names already start with a letter, so the regex is only needed for the rest
+    if name and name[0] not in ASCII_LETTERS:
+        name = LEADING_NON_ALPHA_PATTERN.sub('', name)
+
+    return name.capitalize() if name else None
+
+
+def parse_birthdate(raw_birth_date:str)->tuple:
+    """ Parse the raw birth date in dmmyyyy format into (day, month, year).
+
+        The date digits are split by integer arithmetic and validated against the days of the month,
+        so no date object is created.
+
+        Parameters
+        -----------
+        raw_birth_date: str
+            A birth date string from source file.
+
+        Returns
+        -----------
+        :tuple
+            A (day, month, year) tuple of int if the raw_birth_date is valid date. None otherwise.
+    """
+    # isdigit() alone also accepts non ASCII digits, e.g. '²', which int() cannot parse
+    if not raw_birth_date or not (raw_birth_date.isascii() and raw_birth_date.isdigit()):
+        return None
+
+    n = int(raw_birth_date)
+    year = n % 10000
+    month = n // 10000 % 100
+    day = n // 1000000
+    if year < 1 or month < 1 or month > 12:
+        return None
+
+    days = 29 if month == 2 and calendar.isleap(year) else DAYS_IN_MONTH[month - 1]
+    if day < 1 or day > days:
+        return None
+
+    return (day, month, year)
+
+
+def calculate_age(day:int, month:int, year:int, today:dt.datetime=REFERENCE_DATE)->int:
+    """ Calculate an age in year from the birth day, month and year.
+
+        Parameters
+        -----------
+        day: int
+            Birth day.
+        month: int
+            Birth month.
+        year: int
+            Birth year.
+        today: dt.datetime
+            A reference date used to calculate the age.
 
-    return name if name else None
+        Returns
+        -----------
+        :int
+            The age in year. 0 if the birth date is after today.
+    """
+    age = today.year - year - ((today.month, today.day) < (month, day))
+    return age if age > 0 else 0
 
 
 def transform_birthdate(raw_birth_date:str)->str:
@@ -113,15 +259,73 @@ def transform_birthdate(raw_birth_date:str)->str:
     if not raw_birth_date:
         return None
 
+    birth_date = parse_birthdate(raw_birth_date)
+    if birth_date is None:
+        logger.warning("Invalid birthdate [%s] to a date", raw_birth_date)
+        return None
+
+    return format_birthdate(birth_date)
+
+
+def format_birthdate(birth_date:tuple)->str:
+    """ Format a parsed (day, month, year) birth date in dd/mm/yyyy format.
+
+        Parameters
+        -----------
+        birth_date: tuple
+            A (day, month, year) tuple from parse_birthdate.
+
+        Returns
+        -----------
+        :str
+            A birth date string in dd/mm/yyyy format if the birth_date is not None. None otherwise.
+    """
+    if birth_date is None:
+        return None
+
+    return '{:02d}/{:02d}/{:04d}'.format(*birth_date)
+
+
+def parse_salary(raw_salary:str):
+    """ Parse a salary string into a number.
+
+        The salary is parsed as float, which is precise enough for the 4 decimal places kept.
+        It is parsed as Decimal if STRICT_DECIMAL is enabled.
+
+        Parameters
+        -----------
+        raw_salary: str
+            A salary string.
+
+        Returns
+        -----------
+        :float
+            The salary as float (or Decimal) if the raw_salary is valid finite number. None otherwise.
+    """
     try:
-        year = int(raw_birth_date[-4:])
-        month = int(raw_birth_date[-6:-4])
-        day = int(raw_birth_date[:-6])
-        return dt.date(year, month, day).strftime('%d/%m/%Y')
-    except:
-        logger.warning(f"""Invalid birthdate [{raw_birth_date}] to a date""")
+        salary = Decimal(raw_salary) if STRICT_DECIMAL else float(raw_salary)
+    except (TypeError, ValueError, ArithmeticError):
         return None
 
+    # nan and inf are parsed by both float and Decimal but are not valid salaries
+    return salary if is_finite_number(salary) else None
+
+
+def is_finite_number(number)->bool:
+    """ Check whether a float or Decimal number is finite, i.e. not nan or inf.
+
+        Parameters
+        -----------
+        number: float
+            A float or Decimal number.
+
+        Returns
+        -----------
+        :bool
+            True if the number is finite. False otherwise.
+    """
+    return number.is_finite() if isinstance(number, Decimal) else math.isfinite(number)
+
 
 def transform_salary(raw_salary:str)->str:
     """ Transform the raw salary to $ format with commas.
@@ -139,12 +343,58 @@ def transform_salary(raw_salary:str)->str:
         :str
             A salary string in $ format with commas if the raw_salary is valid number. None otherwise.
     """
-    try:
-        return '${:,.4f}'.format(Decimal(raw_salary))
-    except:
-        logger.warning(f"""Cannot convert salary [{raw_salary}] to a number""")
+    salary = parse_salary(raw_salary)
+    if salary is None:
+        logger.warning("Cannot convert salary [%s] to a number", raw_salary)
+        return None
+
+    return format_salary(salary)
+
+
+def format_salary(salary:float)->str:
+    """ Format a salary number in $ format with commas and 4 decimal places.
+
+        Parameters
+        -----------
+        salary: float
+            The salary number from parse_salary.
+
+        Returns
+        -----------
+        :str
+            A salary string in $ format with commas if the salary is not None. None otherwise.
+    """
+    if salary is None:
         return None
 
+    return '${:,.{}f}'.format(salary, SALARY_DECIMAL_PLACES)
+
+
+def round_salary(salary:float)->float:
+    """ Round a salary number to the decimal places kept in the formatted salary.
+
+        The rounded salary is the value shown by format_salary, so a salary bucket derived from it
+        agrees with the formatted Salary, e.g. 49999.99999 is shown as $50,000.0000 and is in bucket B.
+
+        Parameters
+        -----------
+        salary: float
+            The salary number from parse_salary.
+
+        Returns
+        -----------
+        :float
+            The rounded salary if the salary is not None. None otherwise.
+    """
+    if salary is None:
+        return None
+
+    try:
+        return round(salary, SALARY_DECIMAL_PLACES)
+    except ArithmeticError:
+        # A Decimal with too many digits to be quantized has no decimal places to round
+        return salary
+
 
 def transform_fullname(first_name:str, last_name:str)->str:
     """ Create a full name by concatting first_name and last_name.
@@ -186,9 +436,8 @@ def transform_age(birth_date:str, today:dt.datetime=REFERENCE_DATE)->int:
     if not birth_date:
         return None
 
-    born = dt.datetime.strptime(birth_date, '%d/%m/%Y')
-    age = today.year - born.year - ((today.month, today.day) < (born.month, born.day))
-    return age if age > 0 else 0
+    day, month, year = map(int, birth_date.split('/'))
+    return calculate_age(day, month, year, today)
 
 
 def transform_salary_bucket(formatted_salary:str)->str:
@@ -215,14 +464,45 @@ def transform_salary_bucket(formatted_salary:str)->str:
     if not formatted_salary:
         return None
 
-    salary = Decimal(re.sub(r'[$,]', '', formatted_salary))
-    if salary < 50000:
-        bucket = "A"
-    elif salary > 100000:
-        bucket = "C"
-    else:
-        bucket = "B"
-    return bucket
+    return get_salary_bucket(parse_salary(formatted_salary.translate(SALARY_STRIP_TABLE)))
+
+
+def transform_salary_bucket_raw(raw_salary:str)->str:
+    """ Create an Salary Bucket based on the raw salary from source file, without formatting it first.
+
+        See transform_salary_bucket for the buckets.
+
+        Parameters
+        -----------
+        raw_salary: str
+            A salary string from source file.
+
+        Returns
+        -----------
+        :str
+            The salary bucket (A/B/C) if the salary is valid. None otherwise.
+    """
+    return get_salary_bucket(parse_salary(raw_salary))
+
+
+def get_salary_bucket(salary:float)->str:
+    """ Get the Salary Bucket of a salary number. See transform_salary_bucket for the buckets.
+
+        Parameters
+        -----------
+        salary: float
+            The salary number.
+
+        Returns
+        -----------
+        :str
+            The salary bucket (A/B/C) if the salary is a finite number. None otherwise.
+    """
+    # Comparisons with nan are always false, so non finite salaries are rejected first
+    if salary is None or not is_finite_number(salary):
+        return None
+
+    return SALARY_BUCKETS[(salary >= SALARY_BUCKET_A_LIMIT) + (salary > SALARY_BUCKET_C_LIMIT)]
 
 
 def transform_address(street:str, suburb:str, state:str, post:str)-> dict:
@@ -248,20 +528,8 @@ def transform_address(street:str, suburb:str, state:str, post:str)-> dict:
         :dict
             The new address dict if the some address fields are valid. None otherwise.
     """
-    address = dict()
-    if street:
-        address['Street'] = street
-    if suburb:
-        address['Suburb'] = suburb
-    if state:
-        address['State'] = state
-    if post:
-        address['Post'] = post
-
-    if address:
-        return address
-    else:
-        return None
+    address = {k: v for (k, v) in (('Street', street), ('Suburb', suburb), ('State', state), ('Post', post)) if v}
+    return address if address else None
 
 
 def set_dict_value_not_none(record, key, value):
@@ -287,15 +555,15 @@ def set_dict_value_not_none(record, key, value):
         record[key] = value
 
 
-def remove_unused_fileds(record:dict, unused:list=["FirstName", "LastName", "Suburb", "State", "Post"])->dict:
+def remove_unused_fileds(record:dict, unused:tuple=UNUSED_FIELDS)->dict:
     """ Remove the unused fields from record dict.
 
         Parameters
         -----------
         record: dict
             The dict containing all the fields
-        unused: list
-            The list of field names to be removed.
+        unused: tuple
+            The field names to be removed.
 
         Returns
         -----------
@@ -307,10 +575,33 @@ def remove_unused_fileds(record:dict, unused:list=["FirstName", "LastName", "Sub
     return record
 
 
-def read_file(filename:str, delimiter:str=DELIMITER, schema:list=SCHEMA, quotechar:str=QUOTECHAR)->list:
-    """ Read data from a file and load into memory. Return a dict with data.
+def batched(data:Iterable, size:int)->Iterator:
+    """ Split data into lists of size items. The last list may be shorter.
 
-        Invalid records are removed from result dict.
+        Parameters
+        -----------
+        data: Iterable
+            The records to be split
+        size: int
+            The number of records in each batch
+
+        Returns
+        -----------
+        :Iterator
+            An iterator of lists of records.
+    """
+    records = iter(data)
+    batch = list(islice(records, size))
+    while batch:
+        yield batch
+        batch = list(islice(records, size))
+
+
+def read_file(filename:str, delimiter:str=DELIMITER, schema:list=SCHEMA, quotechar:str=QUOTECHAR)->Iterator:
+    """ Read data from a file record by record.
+
+        The file is streamed, so only the records not yet consumed by the caller are kept in memory.
+        Invalid records are skipped.
 
         Parameters
         -----------
@@ -325,21 +616,26 @@ def read_file(filename:str, delimiter:str=DELIMITER, schema:list=SCHEMA, quotech
 
         Returns
         -----------
-        :list
-            A list of dict of data.
+        :Iterator
+            An iterator of MemberRecord of data.
     """
-    with open(filename, 'r') as csvfile:
+    # newline='' lets the csv reader handle line endings, including newlines in quoted fields
+    with open(filename, 'r', encoding='utf-8', newline='', buffering=READ_BUFFER_SIZE) as csvfile:
         record_reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quotechar)
 
-        # Converted None record is removed from final data
-        data = [r for r in [convert_record_to_dict(record, schema) for record in record_reader] if r]
-
-    return data
+        for record in record_reader:
+            # Converted None record is removed from final data
+            r = convert_record_to_dict(record, schema)
+            if r:
+                yield r
 
 
-def transform_data(data:list)->list:
+def transform_data(data:Iterable)->Iterator:
     """ Transform data and return the result.
 
+        Data is transformed in batches of TRANSFORM_BATCH_SIZE records, so a large source file is never
+        held in memory at once.
+
         The following transformations are done:
 
         1. Convert the BirthDate from the format YYYY-MM-DD to DD/MM/YYYY, Salary in $ format with commas
@@ -353,43 +649,144 @@ def transform_data(data:list)->list:
         6. Drop columns FirstName, LastName
         7. build nested entity class to have address as nested class.
 
+        Parameters
+        -----------
+        data: Iterable
+            The source data as MemberRecord
+
+        Returns
+        -----------
+        :Iterator
+            An iterator of dict of transformed data.
+    """
+    invalid_counts = Counter()
+    for batch in batched(data, TRANSFORM_BATCH_SIZE):
+        yield from transform_batch(batch, invalid_counts)
+
+    # Invalid values are summarised once instead of logged per record
+    if invalid_counts["BirthDate"]:
+        logger.warning("Dropped BirthDate and Age of %d records with invalid birthdate.", invalid_counts["BirthDate"])
+    if invalid_counts["Salary"]:
+        logger.warning("Dropped Salary and SalaryBucket of %d records with invalid salary.", invalid_counts["Salary"])
+
+
+def transform_batch(data:list, invalid_counts:Counter=None)->list:
+    """ Transform a batch of data and return the result. See transform_data for the transformations.
+
         Parameters
         -----------
         data: list
-            The source data
+            A batch of source data as MemberRecord
+        invalid_counts: Counter
+            Counter of invalid BirthDate and Salary values, updated with the invalid values in this batch.
 
         Returns
         -----------
         :list
             A list of dict of transformed data.
     """
-    for record in data:
-        set_dict_value_not_none(record, "BirthDate", transform_birthdate(record.get("BirthDate", None)))
-        set_dict_value_not_none(record, "Salary", transform_salary(record.get("Salary", None)))
-        set_dict_value_not_none(record, "FirstName", transform_name(record.get("FirstName", None)))
-        set_dict_value_not_none(record, "LastName", transform_name(record.get("LastName", None)))
-        set_dict_value_not_none(record, "FullName", transform_fullname(record.get("FirstName", None),
-                                                                       record.get("LastName", None)))
-        set_dict_value_not_none(record, "Age", transform_age(record.get("BirthDate", None)))
-        set_dict_value_not_none(record, "SalaryBucket", transform_salary_bucket(record.get("Salary", None)))
-        set_dict_value_not_none(record, "Address", transform_address(record.get("Address", None),
-                                                                     record.get("Suburb", None),
-                                                                     record.get("State", None),
-                                                                     record.get("Post", None)))
-        remove_unused_fileds(record)
-
-    result = [record for record in data if record]
+    if invalid_counts is None:
+        invalid_counts = Counter()
+
+    if not data:
+        return []
+
+    # Transpose the batch of records into columns
+    (raw_first_names, raw_last_names, companies, raw_birth_dates, raw_salaries, streets, suburbs, states,
+     posts, phones, mobiles, emails) = zip(*data)
+
+    first_names = list(map(transform_name, raw_first_names))
+    last_names = list(map(transform_name, raw_last_names))
+
+    # BirthDate and Salary are parsed once. The stored strings, Age and SalaryBucket are all derived
+    # from the parsed values.
+    birth_dates = list(map(parse_birthdate, raw_birth_dates))
+    for raw_birth_date, birth_date in zip(raw_birth_dates, birth_dates):
+        if raw_birth_date and birth_date is None:
+            logger.debug("Invalid birthdate [%s] to a date", raw_birth_date)
+            invalid_counts["BirthDate"] += 1
+
+    # Salaries are rounded as shown in the stored Salary, so SalaryBucket is derived from the stored value
+    salaries = list(map(round_salary, map(parse_salary, raw_salaries)))
+    for raw_salary, salary in zip(raw_salaries, salaries):
+        if salary is None:
+            logger.debug("Cannot convert salary [%s] to a number", raw_salary)
+            invalid_counts["Salary"] += 1
+
+    # Every transform is applied to a whole column at once. A new dict is then built for every row with
+    # only the fields which are not None, so unused source fields are never copied into the result.
+    columns = {
+        "FullName": map(transform_fullname, first_names, last_names),
+        "Company": companies,
+        "BirthDate": map(format_birthdate, birth_dates),
+        "Age": [calculate_age(*birth_date) if birth_date else None for birth_date in birth_dates],
+        "Salary": map(format_salary, salaries),
+        "SalaryBucket": map(get_salary_bucket, salaries),
+        "Address": map(transform_address, streets, suburbs, states, posts),
+        "Phone": phones,
+        "Mobile": mobiles,
+        "Email": emails,
+    }
+    keys = tuple(columns)
+
+    result = []
+    for values in zip(*columns.values()):
+        record = {key: value for (key, value) in zip(keys, values) if value is not None}
+        if record:
+            result.append(record)
     return result
 
 
-def write_mongo(data:list, mongo_db:str, mongo_collection:str)->tuple:
+def get_mongo_client()->pymongo.MongoClient:
+    """ Get the MongoDB client shared by all the writes in this process.
+
+        The client is created on first use and reused for every source file, so the connection pool
+        is kept alive between files. The connection string is read from the MONGODB_URL environment
+        variable. If MONGODB_WRITE_CONCERN is set (e.g. 0 for unacknowledged writes), it is used as
+        the default write concern of the client.
+
+        Returns
+        -----------
+        :pymongo.MongoClient
+            The shared MongoDB client.
+    """
+    global mongo_client
+    if mongo_client is None:
+        mongo_url = os.environ.get("MONGODB_URL", "mongodb://mongo:27017/")
+        logger.info("mongo_url %s", mongo_url)
+
+        options = {"maxPoolSize": 16}
+        write_concern = os.environ.get("MONGODB_WRITE_CONCERN")
+        if write_concern:
+            # A number of nodes, e.g. 0 or 1, or a tag such as majority
+            try:
+                options["w"] = int(write_concern)
+            except ValueError:
+                options["w"] = write_concern
+
+        mongo_client = pymongo.MongoClient(mongo_url, **options)
+    return mongo_client
+
+
+def close_mongo_client():
+    """ Close the shared MongoDB client if it has been created.
+    """
+    global mongo_client
+    if mongo_client is not None:
+        mongo_client.close()
+        mongo_client = None
+
+
+def write_mongo(data:Iterable, mongo_db:str, mongo_collection:str)->tuple:
     """ Write data into MongoDB.
 
         Since there is no unique key defined, records are appended to MongoDB even if they are duplicated.
+        Records are inserted in batches of MONGO_BATCH_SIZE with unordered writes, so the server can apply
+        a batch in parallel and doesn't stop at the first failed record.
 
         Parameters
         -----------
-        data: list
+        data: Iterable
             The source data
         mongo_db: str
             Mongo database name
@@ -399,30 +796,38 @@ def write_mongo(data:list, mongo_db:str, mongo_collection:str)->tuple:
         Returns
         -----------
         :int
-            Record count inserted into mongodb
+            Record count inserted into mongodb. With unacknowledged writes (write concern 0) the server
+            doesn't confirm the inserts, so this is the record count sent to mongodb.
 
     """
-    mongo_url = os.environ.get("MONGODB_URL", "mongodb://mongo:27017/")
-    logger.info(f"mongo_url {mongo_url}")
+    member_colection = get_mongo_client()[mongo_db][mongo_collection]
 
     inserted_count = 0
-    with pymongo.MongoClient(mongo_url) as mongo:
-        revenue_db = mongo[mongo_db]
-        member_colection = revenue_db[mongo_collection]
-        resp = member_colection.insert_many(data)
-
-        inserted_count = len(resp.inserted_ids)
-        if inserted_count == len(data):
-            logger.info(f"Mongo inserted all {inserted_count} records into database[{mongo_db}], collection[{mongo_collection}].")
-        else:
-            logger.warning(f"Mongo inserted only {inserted_count} records into database[{mongo_db}], collection[{mongo_collection}], "
-                           + f" out of {len(data)} source records."
-                           )
+    source_count = 0
+    acknowledged = True
+    for batch in batched(data, MONGO_BATCH_SIZE):
+        resp = member_colection.insert_many(batch, ordered=False)
+        inserted_count += len(resp.inserted_ids)
+        source_count += len(batch)
+        acknowledged = acknowledged and resp.acknowledged
+
+    if not acknowledged:
+        # inserted_ids are generated by the client, so they don't prove the records were inserted
+        logger.info("Mongo sent %d records (unacknowledged) into database[%s], collection[%s].",
+                    inserted_count, mongo_db, mongo_collection)
+    elif inserted_count == source_count:
+        logger.info("Mongo inserted all %d records into database[%s], collection[%s].",
+                    inserted_count, mongo_db, mongo_collection)
+    else:
+        logger.warning("Mongo inserted only %d records into database[%s], collection[%s], out of %d source records.",
+                       inserted_count, mongo_db, mongo_collection, source_count)
     return inserted_count
 
 
 def run_etl(filename):
     """ Run the etl process for a source filename
+
+        Records are read, transformed and inserted into MongoDB in batches as they are streamed through.
     """
     raw_data = read_file(filename)
     data = transform_data(raw_data)
@@ -3,8 +3,11 @@
     It calls the functions in etl.ingest_member_data to run the etl process.
 """
 
+import atexit
+import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from etl import ingest_member_data as imd
 
@@ -19,18 +22,40 @@ def usage():
     """)
 
 
+def run_etl_files(filenames:list):
+    """
+    Run the etl process for every file and yield (filename, inserted_count) as each file finishes.
+
+    A single file is processed in this process. Multiple files are processed in parallel by a pool of
+    worker processes, each with its own MongoDB client.
+    """
+    if len(filenames) == 1:
+        yield filenames[0], imd.run_etl(filenames[0])
+        return
+
+    max_workers = min(len(filenames), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(imd.run_etl, filename): filename for filename in filenames}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
 def main():
     logging.basicConfig(level=logging.INFO)
     if len(sys.argv) < 2:
         usage()
         sys.exit(1)
 
+    # The MongoDB client is shared by all the files and closed when the process exits
+    atexit.register(imd.close_mongo_client)
+
     filenames = sys.argv[1:]
     for filename in filenames:
-        logger.info(f"Processing file [{filename}]")
-        inserted_count = imd.run_etl(filename)
-        logger.info(f"Record count inserted: {inserted_count}")
-        logger.info(f"Finished processing file [{filename}]")
+        logger.info("Processing file [%s]", filename)
+
+    for filename, inserted_count in run_etl_files(filenames):
+        logger.info("Record count inserted from file [%s]: %d", filename, inserted_count)
+        logger.info("Finished processing file [%s]", filename)
 
 
 if __name__ == '__main__':
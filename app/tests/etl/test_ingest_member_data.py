@@ -1,6 +1,12 @@
 import pytest
+from decimal import Decimal
 from etl import ingest_member_data as imd
 
+def member_record(**fields):
+    # A MemberRecord with empty string for every field not given
+    return imd.MemberRecord._make(fields.get(fn, "") for fn in imd.MemberRecord._fields)
+
+
 @pytest.fixture
 def invalid_record_with_more_fields():
     return ["first_name", "last_name", "company", "birth", "salary", "addr", "suburb",
@@ -19,26 +25,52 @@ def input_data_list1():
             None),
         (["first_name   ", "  last_name", "company", "birth", "salary", "addr", "suburb",
             "state", "post", "phone", "mobile", "  email  "],
-        {"FirstName": "first_name", "LastName": "last_name", "Company": "company",
-         "BirthDate": "birth", "Salary": "salary", "Address": "addr", "Suburb": "suburb",
-        "State": "state", "Post": "post", "Phone": "phone", "Mobile": "mobile", "Email": "email"}),
+        imd.MemberRecord(FirstName="first_name", LastName="last_name", Company="company",
+         BirthDate="birth", Salary="salary", Address="addr", Suburb="suburb",
+         State="state", Post="post", Phone="phone", Mobile="mobile", Email="email")),
     ]
 
 
 def test_convert_record_to_dict(input_data_list1):
     for (source, expected) in input_data_list1:
         assert imd.convert_record_to_dict(source) == expected, \
-            "convert_record_to_dict should convert a record from list to a dict if it is valid, None otherwise."
+            "convert_record_to_dict should convert a record from list to a MemberRecord if it is valid, None otherwise."
+
+
+def test_convert_record_to_dict_with_schema():
+    schema = [("FirstName", "string"), ("LastName", "string")]
+    got = imd.convert_record_to_dict([" york ", "huang "], schema)
+    assert got._asdict() == {"FirstName": "york", "LastName": "huang"}, \
+        "convert_record_to_dict should use the field names of the given schema."
+    assert type(got) is type(imd.convert_record_to_dict(["adam", "lin"], list(schema))), \
+        "convert_record_to_dict should reuse the record type of the same schema."
+    assert imd.convert_record_to_dict(["york"], schema) is None, \
+        "convert_record_to_dict should ignore a record with different number of fields than the given schema."
 
 
 def test_read_file(mocker, input_data_list1):
-    mocker.patch("etl.ingest_member_data.open")
+    mock_open = mocker.patch("etl.ingest_member_data.open")
     mock_record_reader = mocker.patch("csv.reader")
     mock_record_reader.return_value = iter([source for (source, _) in input_data_list1])
     expected = [expected for (_, expected) in input_data_list1 if expected]
-    got = imd.read_file("dummy_filename")
+    got = list(imd.read_file("dummy_filename"))
 
     assert got == expected, "read_file should exclude the invalid records."
+    mock_open.assert_called_once_with("dummy_filename", 'r', encoding='utf-8', newline='',
+                                      buffering=imd.READ_BUFFER_SIZE)
+
+
+@pytest.mark.parametrize(
+    "data, size, expected", [
+        ([1, 2, 3, 4, 5], 2, [[1, 2], [3, 4], [5]]),
+        ([1, 2, 3, 4], 2, [[1, 2], [3, 4]]),
+        ([1, 2], 5, [[1, 2]]),
+        ([], 2, []),
+    ]
+)
+def test_batched(data, size, expected):
+    assert list(imd.batched(iter(data), size)) == expected, \
+        "batched should split data into lists of size items."
 
 
 @pytest.mark.parametrize(
@@ -58,6 +90,41 @@ def test_transform_name(raw_name, expected):
         "transform_name should cleanse a name properly."
 
 
+@pytest.mark.parametrize(
+    "raw_birth_date, expected", [
+        ("11122021", (11, 12, 2021)),
+        ("1011970", (1, 1, 1970)),
+        ("29022000", (29, 2, 2000)),
+        ("29021900", None),
+        ("122190", None),
+        ("01311950", None),
+        ("31021990", None),
+        ("1-011970", None),
+        ("1²1980", None),
+        ("as2111980", None),
+        (None, None),
+        ("", None)
+    ]
+)
+def test_parse_birthdate(raw_birth_date, expected):
+    assert imd.parse_birthdate(raw_birth_date) == expected, \
+        "parse_birthdate should parse a dmmyyyy birthdate into (day, month, year) properly."
+
+
+@pytest.mark.parametrize(
+    "day, month, year, expected", [
+        (1, 12, 1970, 53),
+        (29, 2, 1980, 44),
+        (1, 3, 2020, 4),
+        (2, 3, 2024, 0),
+        (1, 1, 2030, 0),
+    ]
+)
+def test_calculate_age(day, month, year, expected):
+    assert imd.calculate_age(day, month, year) == expected, \
+        f"calculate_age should calcluate the age from {imd.REFERENCE_DATE} properly."
+
+
 @pytest.mark.parametrize(
     "raw_birth_date, expected", [
         ("11122021", "11/12/2021"),
@@ -74,6 +141,46 @@ def test_transform_brithdate(raw_birth_date, expected):
         "transform_birthdate should transform a birthdate to dd/mm/yyyy properly."
 
 
+@pytest.mark.parametrize(
+    "birth_date, expected", [
+        ((11, 12, 2021), "11/12/2021"),
+        ((1, 1, 970), "01/01/0970"),
+        (None, None),
+    ]
+)
+def test_format_birthdate(birth_date, expected):
+    assert imd.format_birthdate(birth_date) == expected, \
+        "format_birthdate should format a (day, month, year) birthdate to dd/mm/yyyy properly."
+
+
+@pytest.mark.parametrize(
+    "salary, expected", [
+        (1112.2021, "$1,112.2021"),
+        (5122190.0, "$5,122,190.0000"),
+        (Decimal("89000.56789"), "$89,000.5679"),
+        (0, "$0.0000"),
+        (None, None),
+    ]
+)
+def test_format_salary(salary, expected):
+    assert imd.format_salary(salary) == expected, \
+        "format_salary should format a salary into $format with commas."
+
+
+@pytest.mark.parametrize(
+    "salary, expected", [
+        (49999.99999, 50000.0),
+        (1112.20214, 1112.2021),
+        (Decimal("49999.99995"), Decimal("50000.0000")),
+        (Decimal("1e30"), Decimal("1e30")),
+        (None, None),
+    ]
+)
+def test_round_salary(salary, expected):
+    assert imd.round_salary(salary) == expected, \
+        "round_salary should round a salary to 4 decimal places."
+
+
 @pytest.mark.parametrize(
     "raw_salary, expected", [
         ("1112.2021", "$1,112.2021"),
@@ -144,6 +251,100 @@ def test_transform_salary_bucket(formatted_salary, expected):
         (f"transform_salary_bucket should calcluate salary from formatted_salary {formatted_salary} properly.")
 
 
+@pytest.mark.parametrize(
+    "raw_salary, expected", [
+        ("14234.5678", "A"),
+        ("49999.9999", "A"),
+        ("50000", "B"),
+        ("100000.0000", "B"),
+        ("100000.0001", "C"),
+        ("8114234.5678", "C"),
+        ("0", "A"),
+        ("01311950a", None),
+        ("nan", None),
+        (None, None),
+        ("", None),
+    ]
+)
+def test_transform_salary_bucket_raw(raw_salary, expected):
+    assert imd.transform_salary_bucket_raw(raw_salary) == expected, \
+        (f"transform_salary_bucket_raw should calcluate salary bucket from raw_salary {raw_salary} properly.")
+
+
+def test_transform_salary_bucket_raw_strict_decimal(mocker):
+    mocker.patch("etl.ingest_member_data.STRICT_DECIMAL", True)
+    assert imd.transform_salary_bucket_raw("100000.00000000001") == "C", \
+        "transform_salary_bucket_raw should put a Decimal salary just above 100,000 in bucket C."
+
+
+@pytest.mark.parametrize(
+    "raw_salary, strict", [
+        ("nan", False),
+        ("nan", True),
+        ("inf", False),
+        ("inf", True),
+        ("-inf", False),
+        ("-inf", True),
+    ]
+)
+def test_transform_salary_bucket_raw_not_finite(mocker, raw_salary, strict):
+    mocker.patch("etl.ingest_member_data.STRICT_DECIMAL", strict)
+    assert imd.transform_salary_bucket_raw(raw_salary) is None, \
+        f"transform_salary_bucket_raw should not bucket the non finite salary {raw_salary}."
+
+
+@pytest.mark.parametrize(
+    "salary, expected", [
+        (0, "A"),
+        (49999.9999, "A"),
+        (50000, "B"),
+        (50000.0, "B"),
+        (100000.0, "B"),
+        (Decimal("100000"), "B"),
+        (100000.0001, "C"),
+        (Decimal("100000.0001"), "C"),
+        (Decimal("100000.00000000001"), "C"),
+        (Decimal("100000.000000000001"), "C"),
+        (Decimal("49999.999999999999"), "A"),
+        (float("nan"), None),
+        (float("inf"), None),
+        (Decimal("NaN"), None),
+        (Decimal("sNaN"), None),
+        (Decimal("-Infinity"), None),
+        (None, None),
+    ]
+)
+def test_get_salary_bucket(salary, expected):
+    assert imd.get_salary_bucket(salary) == expected, \
+        f"get_salary_bucket should find the salary bucket of {salary} properly."
+
+
+@pytest.mark.parametrize(
+    "raw_salary, strict, expected", [
+        ("1112.2021", False, 1112.2021),
+        ("1112.2021", True, Decimal("1112.2021")),
+        ("5122190.", False, 5122190.0),
+        ("01311950a", False, None),
+        ("01311950a", True, None),
+        (None, False, None),
+        (None, True, None),
+        ("", False, None),
+        ("nan", False, None),
+        ("nan", True, None),
+        ("inf", False, None),
+        ("inf", True, None),
+        ("-inf", False, None),
+        ("-inf", True, None),
+        ("1e400", False, None),
+    ]
+)
+def test_parse_salary(mocker, raw_salary, strict, expected):
+    mocker.patch("etl.ingest_member_data.STRICT_DECIMAL", strict)
+    got = imd.parse_salary(raw_salary)
+    assert got == expected and type(got) is type(expected), \
+        "parse_salary should parse a salary into float, or Decimal in strict mode, properly."
+
+
 @pytest.mark.parametrize(
     "street, suburb, state, post, expected", [
         ("1 York street", "Sydney", "NSW", "2000",
@@ -221,13 +422,13 @@ def test_remove_unused_fileds(record, unused, expected):
 @pytest.mark.parametrize(
     "data, expected", [
         ([
-            {"FirstName": "2york", "LastName": "1huang", "Company": "RevenueNSW",
-            "BirthDate": "2111980", "Salary": "89000.56789", "Address": "1 George st", "Suburb": "Sydney",
-            "State": "NSW", "Post": "2000", "Phone": "0298765432", "Mobile": "0404123456", "Email": "york.huang@mycom.com"},
-            {"FirstName": "George", "LastName": "adam", "Company": "RevenueNSW",
-            "BirthDate": "as2111980", "Salary": "89000.56789", "Address": "1 George st", "Suburb": "Sydney",
-            "State": "NSW", "Post": "2000", "Phone": "0298765432", "Mobile": "0404123456", "Email": "york.huang@mycom.com"},
-            {},
+            imd.MemberRecord(FirstName="2york", LastName="1huang", Company="RevenueNSW",
+            BirthDate="2111980", Salary="89000.56789", Address="1 George st", Suburb="Sydney",
+            State="NSW", Post="2000", Phone="0298765432", Mobile="0404123456", Email="york.huang@mycom.com"),
+            imd.MemberRecord(FirstName="George", LastName="adam", Company="RevenueNSW",
+            BirthDate="as2111980", Salary="89000.56789", Address="1 George st", Suburb="Sydney",
+            State="NSW", Post="2000", Phone="0298765432", Mobile="0404123456", Email="york.huang@mycom.com"),
+            member_record(Company="RevenueNSW"),
         ],
         [
             {"FullName": "York Huang", "Company": "RevenueNSW",
@@ -240,15 +441,50 @@ def test_remove_unused_fileds(record, unused, expected):
             "Address": {"Street": "1 George st", "Suburb": "Sydney",
                 "State": "NSW", "Post": "2000"},
             "Phone": "0298765432", "Mobile": "0404123456", "Email": "york.huang@mycom.com"},
+            {"Company": "RevenueNSW", "Phone": "", "Mobile": "", "Email": ""},
         ]),
     ]
 )
 def test_transform_data(data, expected):
-    got = imd.transform_data(data)
+    got = list(imd.transform_data(data))
     assert got == expected, \
         "transform_data should transform data into the final record."
 
 
+@pytest.mark.parametrize(
+    "raw_salary, strict, salary, bucket", [
+        ("49999.99999", False, "$50,000.0000", "B"),
+        ("49999.99994", False, "$49,999.9999", "A"),
+        ("100000.00004", False, "$100,000.0000", "B"),
+        ("100000.00005", False, "$100,000.0001", "C"),
+        ("49999.99999", True, "$50,000.0000", "B"),
+        ("100000.000050", True, "$100,000.0000", "B"),
+    ]
+)
+def test_transform_data_salary_bucket_matches_salary(mocker, raw_salary, strict, salary, bucket):
+    mocker.patch("etl.ingest_member_data.STRICT_DECIMAL", strict)
+    (got,) = imd.transform_data([member_record(Salary=raw_salary)])
+    assert (got["Salary"], got["SalaryBucket"]) == (salary, bucket), \
+        "transform_data should derive SalaryBucket from the stored Salary."
+    assert imd.transform_salary_bucket(got["Salary"]) == got["SalaryBucket"], \
+        "transform_data should store a SalaryBucket consistent with transform_salary_bucket of the Salary."
+
+
+def test_transform_data_summarises_invalid_values(caplog):
+    data = [
+        member_record(FirstName="York", BirthDate="as2111980", Salary="89000.56789"),
+        member_record(FirstName="George", BirthDate="31021990", Salary="abc"),
+        member_record(FirstName="Adam", BirthDate="", Salary="1000"),
+    ]
+    with caplog.at_level("WARNING", logger="etl.ingest_member_data"):
+        list(imd.transform_data(data))
+
+    assert [r.getMessage() for r in caplog.records] == [
+        "Dropped BirthDate and Age of 2 records with invalid birthdate.",
+        "Dropped Salary and SalaryBucket of 1 records with invalid salary.",
+    ], "transform_data should log one summary warning per invalid field."
+
+
 @pytest.mark.parametrize(
     "data, expected", [
         ([
@@ -267,18 +503,87 @@ def test_transform_data(data, expected):
     ]
 )
 def test_write_mongo(mocker, data, expected):
+    mocker.patch("etl.ingest_member_data.mongo_client", None)
     mock_mongo = mocker.patch("pymongo.MongoClient")
-    mock_mongo.return_value.__enter__.return_value.__getitem__.return_value.__getitem__ \
+    mock_mongo.return_value.__getitem__.return_value.__getitem__ \
         .return_value.insert_many.return_value.inserted_ids = expected
 
     got = imd.write_mongo(data, "mymongodb", "mycollection")
-    mock_insert_many = mock_mongo.return_value.__enter__.return_value.__getitem__ \
+    mock_insert_many = mock_mongo.return_value.__getitem__ \
         .return_value.__getitem__.return_value.insert_many
 
     call_args_list = mock_insert_many.call_args_list
     args, kwargs = call_args_list[0]
-    assert mock_insert_many.call_count == 1 and args == (data,) and kwargs == {}, \
-        "write_mongo should call insert_many once with data parameter"
+    assert mock_insert_many.call_count == 1 and args == (data,) and kwargs == {"ordered": False}, \
+        "write_mongo should call insert_many once with data parameter and unordered writes"
 
     assert got == len(expected), \
         f"write_mongo should insert {len(expected)} records into MongoDB."
+
+
+def test_write_mongo_batches(mocker):
+    mocker.patch("etl.ingest_member_data.mongo_client", None)
+    mocker.patch("etl.ingest_member_data.MONGO_BATCH_SIZE", 2)
+    mock_mongo = mocker.patch("pymongo.MongoClient")
+    mock_insert_many = mock_mongo.return_value.__getitem__.return_value.__getitem__.return_value.insert_many
+    mock_insert_many.side_effect = lambda batch, ordered: mocker.Mock(inserted_ids=list(range(len(batch))))
+    data = [{"FullName": "York Huang"}, {"FullName": "George Adam"}, {"FullName": "Adam Lin"}]
+
+    got = imd.write_mongo(data, "mymongodb", "mycollection")
+
+    assert [args for (args, _) in mock_insert_many.call_args_list] == [(data[:2],), (data[2:],)], \
+        "write_mongo should insert records in batches of MONGO_BATCH_SIZE."
+    assert got == len(data), \
+        f"write_mongo should insert {len(data)} records into MongoDB."
+
+
+def test_write_mongo_unacknowledged(mocker, caplog):
+    mocker.patch("etl.ingest_member_data.mongo_client", None)
+    mock_mongo = mocker.patch("pymongo.MongoClient")
+    mock_insert_many = mock_mongo.return_value.__getitem__.return_value.__getitem__.return_value.insert_many
+    mock_insert_many.return_value = mocker.Mock(inserted_ids=[1, 2], acknowledged=False)
+    data = [{"FullName": "York Huang"}, {"FullName": "George Adam"}]
+
+    with caplog.at_level("INFO", logger="etl.ingest_member_data"):
+        got = imd.write_mongo(data, "mymongodb", "mycollection")
+
+    assert got == len(data), \
+        f"write_mongo should return the {len(data)} records sent to MongoDB."
+    assert caplog.records[-1].getMessage() == \
+        "Mongo sent 2 records (unacknowledged) into database[mymongodb], collection[mycollection].", \
+        "write_mongo should not report unacknowledged records as inserted."
+
+
+@pytest.mark.parametrize(
+    "write_concern, expected", [
+        ("0", 0),
+        ("1", 1),
+        ("majority", "majority"),
+        ("²", "²"),
+    ]
+)
+def test_get_mongo_client_write_concern(mocker, write_concern, expected):
+    mocker.patch("etl.ingest_member_data.mongo_client", None)
+    mocker.patch.dict("os.environ", {"MONGODB_URL": "mongodb://mymongo:27017/", "MONGODB_WRITE_CONCERN": write_concern})
+    mock_mongo = mocker.patch("pymongo.MongoClient")
+
+    imd.get_mongo_client()
+
+    mock_mongo.assert_called_once_with("mongodb://mymongo:27017/", maxPoolSize=16, w=expected)
+
+
+def test_get_mongo_client(mocker):
+    mocker.patch("etl.ingest_member_data.mongo_client", None)
+    mocker.patch.dict("os.environ", {"MONGODB_URL": "mongodb://mymongo:27017/", "MONGODB_WRITE_CONCERN": "0"})
+    mock_mongo = mocker.patch("pymongo.MongoClient")
+
+    first = imd.get_mongo_client()
+    second = imd.get_mongo_client()
+
+    assert first is second and mock_mongo.call_count == 1, \
+        "get_mongo_client should create the MongoDB client once and reuse it."
+    mock_mongo.assert_called_once_with("mongodb://mymongo:27017/", maxPoolSize=16, w=0)
+
+    imd.close_mongo_client()
+    assert imd.mongo_client is None and first.close.call_count == 1, \
+        "close_mongo_client should close the shared MongoDB client."
@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+import main
+
+
+class FakeExecutor:
+    # Runs submitted calls immediately in this process, so the results can be checked without worker processes
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_run_etl_files_single_file(mocker):
+    mock_executor = mocker.patch("main.ProcessPoolExecutor")
+    mock_run_etl = mocker.patch("etl.ingest_member_data.run_etl", return_value=10)
+
+    got = list(main.run_etl_files(["file1.csv"]))
+
+    assert got == [("file1.csv", 10)], \
+        "run_etl_files should yield the filename and inserted count of a single file."
+    mock_run_etl.assert_called_once_with("file1.csv")
+    assert mock_executor.call_count == 0, \
+        "run_etl_files should process a single file without a process pool."
+
+
+def test_run_etl_files_multiple_files(mocker):
+    counts = {"file1.csv": 10, "file2.csv": 20, "file3.csv": 30}
+    mock_executor = mocker.patch("main.ProcessPoolExecutor", side_effect=FakeExecutor)
+    mocker.patch("etl.ingest_member_data.run_etl", side_effect=counts.get)
+    mocker.patch("os.cpu_count", return_value=2)
+
+    got = list(main.run_etl_files(list(counts)))
+
+    assert sorted(got) == sorted(counts.items()), \
+        "run_etl_files should yield the filename and inserted count of every file."
+    mock_executor.assert_called_once_with(max_workers=2)